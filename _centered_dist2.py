@@ -0,0 +1,90 @@
+import functools
+import numpy
+
+@functools.lru_cache(maxsize=8)
+def _centered_dist2(rows, columns):
+
+   '''
+   title::
+      _centered_dist2
+
+   description::
+      This method builds the squared-distance array for a filter of the
+      given dimensions, with distances measured from the center of the
+      array. The frequency filter constructors all threshold or evaluate
+      their shapes on this same grid, so the result is cached (keyed on
+      the dimensions) and repeated filter constructions at the same
+      resolution reuse a single array instead of rebuilding it each call.
+      The returned array is marked read-only since it is shared between
+      callers; operate on copies or via expressions that allocate a new
+      result.
+
+   attributes::
+      rows
+         Number of rows (integer) in the filter to be constructed.
+      columns
+         Number of columns (integer) in the filter to be constructed.
+
+   returns::
+      read-only numpy array (numpy.float32) of squared distances from the
+      center of the array, with the specified dimensions
+
+   author::
+      Victoria Scholl
+   '''
+
+   # single precision: the filters are multipliers visualized/applied at
+   # 8-bit precision, and float32 halves the bandwidth of every pass
+   v = numpy.arange(rows, dtype=numpy.float32) - rows//2
+   u = numpy.arange(columns, dtype=numpy.float32) - columns//2
+   dist2 = (u*u)[None,:] + (v*v)[:,None]
+   dist2.setflags(write=False)
+
+   return dist2
+
+
+def _mirror_quadrant(quadrant, rows, columns):
+
+   '''
+   title::
+      _mirror_quadrant
+
+   description::
+      This method assembles a full centered filter from one evaluated
+      quadrant. Every centered radial filter shape is symmetric under
+      reflection through the center of the array, so the expensive math
+      only needs to be evaluated on the (rows//2+1) x (columns//2+1)
+      quadrant covering the non-positive frequencies; the remaining
+      rows and columns are filled in by mirroring. For even dimensions
+      the leading (Nyquist) row/column has no positive-frequency partner
+      and is excluded from the mirror.
+
+   attributes::
+      quadrant
+         Filter values evaluated on the centered squared-distance grid
+         slice [:rows//2+1, :columns//2+1], as a numpy array.
+      rows
+         Number of rows (integer) in the full filter.
+      columns
+         Number of columns (integer) in the full filter.
+
+   returns::
+      numpy array with the full filter dimensions, filled by mirroring
+      the supplied quadrant
+
+   author::
+      Victoria Scholl
+   '''
+
+   full = numpy.empty((rows, columns), dtype=quadrant.dtype)
+   full[:rows//2+1, :columns//2+1] = quadrant
+
+   # mirror the columns, then the rows; the slice start skips the
+   # unpaired Nyquist column/row when the dimension is even
+   columnStart = 2*(columns//2) - columns + 1
+   full[:rows//2+1, columns//2+1:] = \
+      full[:rows//2+1, columnStart:columns//2][:, ::-1]
+   rowStart = 2*(rows//2) - rows + 1
+   full[rows//2+1:, :] = full[rowStart:rows//2, :][::-1, :]
+
+   return full
@@ -1,6 +1,11 @@
 import ipcv
 import numpy
 
+from ipcv._centered_dist2 import _centered_dist2, _mirror_quadrant
+from ipcv._filter_kernels import _butterworth_bandreject_kernel, \
+                                 _gaussian_bandreject_kernel, \
+                                 _ideal_bandreject
+
 def filter_bandreject(im, radialCenter, bandwidth, order=1, filterShape=ipcv.IPCV_IDEAL):
 
    '''
@@ -16,13 +21,12 @@ def filter_bandreject(im, radialCenter, bandwidth, order=1, filterShape=ipcv.IPC
       First, the dimensions of the input image are determined.
       Then an array of zeros is created with the same dimensions to serve 
       as the bandreject filter. 
-      The dist method is used to return a distance value at each pixel
-      location (measured from the corner of the image). This dist filter
-      is then rolled twice in both the x and y dimensions to center the 
-      values about the center of the array. 
-      The specified filter shape is then created based on the use's input. 
-      The filter is returned as type numpy.float64; ready to be applied to
-      the input image using the frequency_filter.py method. 
+      A distance value is then computed at each pixel location, measured
+      from the center of the array.
+      The specified filter shape is then created based on the use's input.
+      The filter is returned as type numpy.float32 (the ideal shape as a
+      numpy.bool_ mask); ready to be applied to the input image using the
+      frequency_filter.py method.
 
    attributes::
       im
@@ -60,27 +64,72 @@ def filter_bandreject(im, radialCenter, bandwidth, order=1, filterShape=ipcv.IPC
 
    # get image dimensions, which dictate the filter dimensions
    imRows, imColumns, imBands, dataType = ipcv.dimensions(im)
-   bandRejectFilter = numpy.zeros([imRows,imColumns])
 
-   # use ipcv.dist to generate an array with distances from the corner pixel.
-   # roll twice to center the array (distances measured from center) 
-   distFilter = ipcv.dist( ( imRows, imColumns ) )
-   distFilter = numpy.roll(numpy.roll(distFilter, imRows/2, axis=0), imColumns/2, axis=1)
+   # when the numba kernels are available, evaluate the butterworth/gaussian
+   # shapes with a fused parallel kernel (single pass, no distance grid or
+   # temporaries)
+   if _butterworth_bandreject_kernel is not None and \
+         filterShape != ipcv.IPCV_IDEAL:
+      bandRejectFilter = numpy.empty((imRows, imColumns),
+                                      dtype=numpy.float32)
+      if filterShape == ipcv.IPCV_BUTTERWORTH:
+         _butterworth_bandreject_kernel(imRows, imColumns,
+                                        float(radialCenter),
+                                        float(bandwidth), order,
+                                        bandRejectFilter)
+      else:
+         _gaussian_bandreject_kernel(imRows, imColumns,
+                                     float(radialCenter), float(bandwidth),
+                                     bandRejectFilter)
+      return bandRejectFilter
+
+   # centered squared-distance array, cached per resolution and shared
+   # (read-only) across the filter constructors; every shape below can be
+   # written in terms of squared distances, so the sqrt pass over the full
+   # array is never paid
+   distFilter2 = _centered_dist2(imRows, imColumns)
 
    if filterShape == ipcv.IPCV_IDEAL:
-      # threshold dist array. distances outside (radialCenter, radialCenter
-      # plus bandwidth) set to 1, else 0. 
-      bandRejectFilter[ distFilter < radialCenter ] = 1
-      bandRejectFilter[ distFilter > radialCenter + bandwidth ] = 1
+      # threshold squared distances. distances outside (radialCenter,
+      # radialCenter plus bandwidth) set to 1, else 0; the binary mask is
+      # kept as bool (1 byte/pixel) and promotes for free when multiplied
+      # against a spectrum
+      if _ideal_bandreject is not None:
+         bandRejectFilter = _ideal_bandreject(
+            distFilter2, numpy.float32(radialCenter**2),
+            numpy.float32((radialCenter + bandwidth)**2))
+      else:
+         bandRejectFilter = ((distFilter2 < radialCenter**2) |
+                             (distFilter2 > (radialCenter + bandwidth)**2))
 
    elif filterShape == ipcv.IPCV_BUTTERWORTH:  # butterworth equation
-      bandRejectFilter = 1 / ( 1 + (( distFilter * bandwidth / ( distFilter ** 2 - radialCenter **2)   ) ** 2 * order)) 
+      # evaluate the expensive math on one quadrant only (the centered
+      # shape is symmetric under reflection through the center), working
+      # in a single buffer so no other temporaries are allocated:
+      # 1 / (1 + d2*bandwidth**2 / (d2 - rc**2)**2 * order)
+      quadrant2 = distFilter2[:imRows//2+1, :imColumns//2+1]
+      buffer = quadrant2 - radialCenter**2
+      numpy.square(buffer, out=buffer)
+      numpy.divide(quadrant2, buffer, out=buffer)
+      buffer *= bandwidth**2 * order
+      buffer += 1
+      numpy.reciprocal(buffer, out=buffer)
+      bandRejectFilter = _mirror_quadrant(buffer, imRows, imColumns)
 
    else: # Third filter type option is Gaussian
-      bandRejectFilter = 1 - numpy.exp( -0.5 * ( ( distFilter ** 2 - radialCenter **2 ) / (distFilter * bandwidth)) ** 2 )
+      # evaluate the expensive exp on one quadrant only, as above, in a
+      # single buffer: 1 - exp(-0.5*(d2 - rc**2)**2 / (d2*bandwidth**2))
+      quadrant2 = distFilter2[:imRows//2+1, :imColumns//2+1]
+      buffer = quadrant2 - radialCenter**2
+      numpy.square(buffer, out=buffer)
+      numpy.divide(buffer, quadrant2, out=buffer)
+      buffer *= -0.5 / bandwidth**2
+      numpy.exp(buffer, out=buffer)
+      numpy.subtract(1.0, buffer, out=buffer)
+      bandRejectFilter = _mirror_quadrant(buffer, imRows, imColumns)
+
 
-   
-   return bandRejectFilter.astype(numpy.float64)
+   return bandRejectFilter
 
 
 
@@ -113,16 +162,16 @@ if __name__ == '__main__':
    # Create a 3D plot and image visualization of the frequency domain filter
    rows = im.shape[0]
    columns = im.shape[1]
-   u = numpy.arange(-columns/2, columns/2, 1)
-   v = numpy.arange(-rows/2, rows/2, 1)
+   u = numpy.arange(-columns//2, columns//2)
+   v = numpy.arange(-rows//2, rows//2)
    u, v = numpy.meshgrid(u, v)
 
    figure = matplotlib.pyplot.figure('Frequency Domain Filter', (14, 6))
    p = figure.add_subplot(1, 2, 1, projection='3d')
    p.set_xlabel('u')
-   p.set_xlim3d(-columns/2, columns/2)
+   p.set_xlim3d(-columns//2, columns//2)
    p.set_ylabel('v')
-   p.set_ylim3d(-rows/2, rows/2)
+   p.set_ylim3d(-rows//2, rows//2)
    p.set_zlabel('Weight')
    p.set_zlim3d(0, 1)
    p.plot_surface(u, v, frequencyFilter)
@@ -43,9 +43,17 @@ def filter_highpass(im, cutoffFrequency, order=1, filterShape=ipcv.IPCV_IDEAL):
 
    '''
 
-   highPass = 1 - ipcv.filter_lowpass(im, cutoffFrequency, order, filterShape)
+   lowPassFilter = ipcv.filter_lowpass(im, cutoffFrequency, order, filterShape)
 
-   return highPass.astype(numpy.float64)
+   # the reject filter has no other owner here, so invert it in place
+   # rather than allocating a second full-size array; ideal bool masks
+   # are negated logically, float shapes arithmetically
+   if lowPassFilter.dtype == numpy.bool_:
+      numpy.logical_not(lowPassFilter, out=lowPassFilter)
+   else:
+      numpy.subtract(1.0, lowPassFilter, out=lowPassFilter)
+
+   return lowPassFilter
 
 if __name__ == '__main__':
 
@@ -73,16 +81,16 @@ if __name__ == '__main__':
    # Create a 3D plot and image visualization of the frequency domain filter
    rows = im.shape[0]
    columns = im.shape[1]
-   u = numpy.arange(-columns/2, columns/2, 1)
-   v = numpy.arange(-rows/2, rows/2, 1)
+   u = numpy.arange(-columns//2, columns//2)
+   v = numpy.arange(-rows//2, rows//2)
    u, v = numpy.meshgrid(u, v)
 
    figure = matplotlib.pyplot.figure('Frequency Domain Filter', (14, 6))
    p = figure.add_subplot(1, 2, 1, projection='3d')
    p.set_xlabel('u')
-   p.set_xlim3d(-columns/2, columns/2)
+   p.set_xlim3d(-columns//2, columns//2)
    p.set_ylabel('v')
-   p.set_ylim3d(-rows/2, rows/2)
+   p.set_ylim3d(-rows//2, rows//2)
    p.set_zlabel('Weight')
    p.set_zlim3d(0, 1)
    p.plot_surface(u, v, frequencyFilter)
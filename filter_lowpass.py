@@ -1,6 +1,11 @@
 import ipcv
 import numpy
 
+from ipcv._centered_dist2 import _centered_dist2, _mirror_quadrant
+from ipcv._filter_kernels import _butterworth_lowpass_kernel, \
+                                 _gaussian_lowpass_kernel, \
+                                 _ideal_lowpass
+
 def filter_lowpass(im, cutoffFrequency, order=1, filterShape=ipcv.IPCV_IDEAL):
 
    '''
@@ -13,13 +18,12 @@ def filter_lowpass(im, cutoffFrequency, order=1, filterShape=ipcv.IPCV_IDEAL):
       First, the dimensions of the input image are determined.
       Then an array of zeros is created with the same dimensions to serve 
       as the lowpass filter. 
-      The dist method is used to return a distance value at each pixel
-      location (measured from the corner of the image). This dist filter
-      is then rolled twice in both the x and y dimensions to center the 
-      values about the center of the array. 
-      The specified filter shape is then created based on the use's input. 
-      The filter is returned as type numpy.float64; ready to be applied to
-      the input image using the frequency_filter.py method. 
+      A distance value is then computed at each pixel location, measured
+      from the center of the array.
+      The specified filter shape is then created based on the use's input.
+      The filter is returned as type numpy.float32 (the ideal shape as a
+      numpy.bool_ mask); ready to be applied to the input image using the
+      frequency_filter.py method.
 
    attributes::
       im
@@ -54,27 +58,58 @@ def filter_lowpass(im, cutoffFrequency, order=1, filterShape=ipcv.IPCV_IDEAL):
 
    # get image dimensions, which dictate the filter dimensions
    imRows, imColumns, imBands, dataType = ipcv.dimensions(im)
-   lowPassFilter = numpy.zeros([imRows,imColumns])
-
-   # use ipcv.dist to generate an array with distances from the corner pixel.
-   # roll twice to center the array (distances measured from center) 
-   distFilter = ipcv.dist( ( imRows, imColumns ) )
-   distFilter = numpy.roll(numpy.roll(distFilter, imRows/2, axis=0), 
-                           imColumns/2, axis=1)
 
+   # when the numba kernels are available, evaluate the butterworth/gaussian
+   # shapes with a fused parallel kernel (single pass, no distance grid or
+   # temporaries)
+   if _butterworth_lowpass_kernel is not None and \
+         filterShape != ipcv.IPCV_IDEAL:
+      lowPassFilter = numpy.empty((imRows, imColumns),
+                                  dtype=numpy.float32)
+      if filterShape == ipcv.IPCV_BUTTERWORTH:
+         _butterworth_lowpass_kernel(imRows, imColumns,
+                                     float(cutoffFrequency), order,
+                                     lowPassFilter)
+      else:
+         _gaussian_lowpass_kernel(imRows, imColumns,
+                                  float(cutoffFrequency), lowPassFilter)
+      return lowPassFilter
+
+   # centered squared-distance array, cached per resolution and shared
+   # (read-only) across the filter constructors; every shape below can be
+   # written in terms of squared distances, so the sqrt pass over the full
+   # array is never paid
+   distFilter2 = _centered_dist2(imRows, imColumns)
 
    if filterShape == ipcv.IPCV_IDEAL:
-      # threshold dist array. distances < cutoff freq set to 1, else to 0. 
-      lowPassFilter[ distFilter <= cutoffFrequency ] = 1
-      lowPassFilter[ distFilter > cutoffFrequency ] = 0
+      # threshold squared distances against the squared cutoff frequency;
+      # the binary mask is kept as bool (1 byte/pixel) and promotes for
+      # free when multiplied against a spectrum
+      if _ideal_lowpass is not None:
+         lowPassFilter = _ideal_lowpass(
+            distFilter2, numpy.float32(cutoffFrequency*cutoffFrequency))
+      else:
+         lowPassFilter = distFilter2 <= cutoffFrequency*cutoffFrequency
 
    elif filterShape == ipcv.IPCV_BUTTERWORTH:  # butterworth equation
-      lowPassFilter = 1 / ( 1 + (( distFilter/cutoffFrequency)**(2*order)))
+      # evaluate the expensive pow on one quadrant only; the centered
+      # shape is symmetric under reflection through the center
+      quadrant2 = distFilter2[:imRows//2+1, :imColumns//2+1]
+      lowPassFilter = _mirror_quadrant(
+         1 / ( 1 + (quadrant2/cutoffFrequency**2)**order ),
+         imRows, imColumns)
 
    else: # Third filter type option is Gaussian
-      lowPassFilter = numpy.exp(-1*(distFilter**2)/(2.0*cutoffFrequency**2))
+      # the gaussian is separable: exp(-(u**2+v**2)/(2*c**2)) is the outer
+      # product of two 1-D exponentials, so only rows+columns exp calls
+      # are evaluated instead of rows*columns
+      v = numpy.arange(imRows, dtype=numpy.float32) - imRows//2
+      u = numpy.arange(imColumns, dtype=numpy.float32) - imColumns//2
+      gaussianV = numpy.exp(-(v*v)/(2.0*cutoffFrequency**2))
+      gaussianU = numpy.exp(-(u*u)/(2.0*cutoffFrequency**2))
+      lowPassFilter = numpy.multiply.outer(gaussianV, gaussianU)
 
-   return lowPassFilter.astype(numpy.float64)
+   return lowPassFilter
 
 
 
@@ -104,16 +139,16 @@ if __name__ == '__main__':
    # Create a 3D plot and image visualization of the frequency domain filter
    rows = im.shape[0]
    columns = im.shape[1]
-   u = numpy.arange(-columns/2, columns/2, 1)
-   v = numpy.arange(-rows/2, rows/2, 1)
+   u = numpy.arange(-columns//2, columns//2)
+   v = numpy.arange(-rows//2, rows//2)
    u, v = numpy.meshgrid(u, v)
 
    figure = matplotlib.pyplot.figure('Frequency Domain Filter', (14, 6))
    p = figure.add_subplot(1, 2, 1, projection='3d')
    p.set_xlabel('u')
-   p.set_xlim3d(-columns/2, columns/2)
+   p.set_xlim3d(-columns//2, columns//2)
    p.set_ylabel('v')
-   p.set_ylim3d(-rows/2, rows/2)
+   p.set_ylim3d(-rows//2, rows//2)
    p.set_zlabel('Weight')
    p.set_zlim3d(0, 1)
    p.plot_surface(u, v, frequencyFilter)
@@ -0,0 +1,69 @@
+import ipcv
+import numpy
+
+def filter_lowpass_fft(im, cutoffFrequency, order=1,
+                       filterShape=ipcv.IPCV_IDEAL):
+
+   '''
+   title::
+      filter_lowpass_fft
+
+   description::
+      This method creates a lowpass filter in the natural (uncentered)
+      ordering of the Fourier transform, with the zero-frequency
+      component at the corner of the array. The squared frequency
+      coordinates are built fftfreq-style, so the filter can be
+      multiplied directly against an unshifted transform and no
+      fftshift/ifftshift is ever needed: pass the result to
+      ipcv.frequency_filter with centered=False. The filter shapes and
+      return types match ipcv.filter_lowpass (numpy.float32, with the
+      ideal shape as a numpy.bool_ mask).
+
+   attributes::
+      im
+         Input image of tpye numpy nd array, used to get the dimensions for
+         the frequency filter.
+      cutoffFrequency
+         Frequency of type integer above which to attentuate higher frequencies
+         (frequencies lower than the cutoff value will be preserved).
+      order
+         Integer value that influences the shape of the butterworth filter.
+         The higher the order, the more the butterworth filter resembles an
+         ideal filter.
+      filterShape
+         Options for the shape of the filter, specified in the constants.py
+         file in the ipcv directory (IDEAL, BUTTERWORTH or GAUSSIAN); see
+         ipcv.filter_lowpass for details.
+
+   returns::
+      lowpass filter in FFT-natural order - numpy array with the same
+      dimensions as the input image
+
+   author::
+      Victoria Scholl
+   '''
+
+   # get image dimensions, which dictate the filter dimensions
+   imRows, imColumns, imBands, dataType = ipcv.dimensions(im)
+
+   # squared frequency coordinates in FFT-natural order (zero frequency
+   # first, negative frequencies in the upper half)
+   v = numpy.fft.fftfreq(imRows, d=1.0/imRows).astype(numpy.float32)
+   u = numpy.fft.fftfreq(imColumns, d=1.0/imColumns).astype(numpy.float32)
+   distFilter2 = (u*u)[None,:] + (v*v)[:,None]
+
+   if filterShape == ipcv.IPCV_IDEAL:
+      # threshold squared distances against the squared cutoff frequency
+      lowPassFilter = distFilter2 <= cutoffFrequency*cutoffFrequency
+
+   elif filterShape == ipcv.IPCV_BUTTERWORTH:  # butterworth equation
+      lowPassFilter = 1 / ( 1 + (distFilter2/cutoffFrequency**2)**order )
+
+   else: # Third filter type option is Gaussian
+      # separable: the outer product of two 1-D exponentials evaluates
+      # only rows+columns exp calls instead of rows*columns
+      gaussianV = numpy.exp(-(v*v)/(2.0*cutoffFrequency**2))
+      gaussianU = numpy.exp(-(u*u)/(2.0*cutoffFrequency**2))
+      lowPassFilter = numpy.multiply.outer(gaussianV, gaussianU)
+
+   return lowPassFilter
@@ -46,9 +46,17 @@ title::
 
  
    '''
-   notchPassFilter = 1 - ipcv.filter_notchreject(im, notchCenter, notchRadius, order, filterShape)
+   rejectFilter = ipcv.filter_notchreject(im, notchCenter, notchRadius, order, filterShape)
 
-   return notchPassFilter.astype(numpy.float64)
+   # the reject filter has no other owner here, so invert it in place
+   # rather than allocating a second full-size array; ideal bool masks
+   # are negated logically, float shapes arithmetically
+   if rejectFilter.dtype == numpy.bool_:
+      numpy.logical_not(rejectFilter, out=rejectFilter)
+   else:
+      numpy.subtract(1.0, rejectFilter, out=rejectFilter)
+
+   return rejectFilter
 
 
 
@@ -78,16 +86,16 @@ if __name__ == '__main__':
    # Create a 3D plot and image visualization of the frequency domain filter
    rows = im.shape[0]
    columns = im.shape[1]
-   u = numpy.arange(-columns/2, columns/2, 1)
-   v = numpy.arange(-rows/2, rows/2, 1)
+   u = numpy.arange(-columns//2, columns//2)
+   v = numpy.arange(-rows//2, rows//2)
    u, v = numpy.meshgrid(u, v)
 
    figure = matplotlib.pyplot.figure('Frequency Domain Filter', (14, 6))
    p = figure.add_subplot(1, 2, 1, projection='3d')
    p.set_xlabel('u')
-   p.set_xlim3d(-columns/2, columns/2)
+   p.set_xlim3d(-columns//2, columns//2)
    p.set_ylabel('v')
-   p.set_ylim3d(-rows/2, rows/2)
+   p.set_ylim3d(-rows//2, rows//2)
    p.set_zlabel('Weight')
    p.set_zlim3d(0, 1)
    p.plot_surface(u, v, frequencyFilter)
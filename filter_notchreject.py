@@ -1,6 +1,10 @@
 import ipcv
 import numpy
 
+from ipcv._filter_kernels import _notchreject_butterworth_kernel, \
+                                 _notchreject_gaussian_kernel, \
+                                 _notchreject_ideal_kernel
+
 def filter_notchreject(im, notchCenter, notchRadius, order=1, filterShape=ipcv.IPCV_IDEAL):
 
    '''
@@ -17,12 +21,11 @@ def filter_notchreject(im, notchCenter, notchRadius, order=1, filterShape=ipcv.I
       First, the dimensions of the input image are determined.
       Then an array of ones is created with the same dimensions to serve 
       as the notchreject filter. 
-      The dist method is used to return a distance value at each pixel
-      location (measured from the corner of the image). This dist filter
-      is then rolled twice in both the x and y dimensions to center the 
-      values about the center of the array. 
-      The specified filter shape is then created based on the use's input. 
-      The filter is returned as type numpy.float64. The filter is ready to be 
+      For each notch, the distances from the notch center and from its
+      conjugate are computed directly about the center of the array.
+      The specified filter shape is then created based on the use's input.
+      The filter is returned as type numpy.float32 (the ideal shape as a
+      numpy.bool_ mask). The filter is ready to be
       multiplied with a centered fourier transform of the input image.
 
    attributes::
@@ -60,41 +63,84 @@ def filter_notchreject(im, notchCenter, notchRadius, order=1, filterShape=ipcv.I
 
    # get image dimensions, which dictate the filter dimensions
    imRows, imColumns, imBands, dataType = ipcv.dimensions(im)
-   notchRejectFilter = numpy.ones([imRows,imColumns])
 
-   # use ipcv.dist to generate an array with distances from the corner pixel.
-   # roll twice to center the array (distances measured from center) 
-   distFilter = ipcv.dist( ( imRows, imColumns ) )
-   distFilter = numpy.roll(numpy.roll(distFilter, imRows/2, axis=0), imColumns/2, axis=1)
+   # when the numba kernels are available, handle every notch in one fused
+   # parallel pass over the pixels instead of a Python-level loop doing
+   # full-array math per notch
+   if _notchreject_ideal_kernel is not None:
+      notchU = numpy.array([center[0] for center in notchCenter],
+                           dtype=numpy.float64)
+      notchV = numpy.array([center[1] for center in notchCenter],
+                           dtype=numpy.float64)
+      radius = numpy.array(notchRadius, dtype=numpy.float64)
+      if filterShape == ipcv.IPCV_IDEAL:
+         notchRejectFilter = numpy.empty((imRows, imColumns),
+                                         dtype=numpy.bool_)
+         _notchreject_ideal_kernel(imRows, imColumns, notchU, notchV,
+                                   radius, notchRejectFilter)
+      elif filterShape == ipcv.IPCV_BUTTERWORTH:
+         notchRejectFilter = numpy.empty((imRows, imColumns),
+                                         dtype=numpy.float32)
+         _notchreject_butterworth_kernel(imRows, imColumns, notchU,
+                                         notchV, radius, order,
+                                         notchRejectFilter)
+      else:
+         notchRejectFilter = numpy.empty((imRows, imColumns),
+                                         dtype=numpy.float32)
+         _notchreject_gaussian_kernel(imRows, imColumns, notchU, notchV,
+                                      radius, notchRejectFilter)
+      return notchRejectFilter
+
+   # the ideal shape is a binary mask, kept as bool (1 byte/pixel); it
+   # promotes for free when multiplied against a spectrum
+   if filterShape == ipcv.IPCV_IDEAL:
+      notchRejectFilter = numpy.ones((imRows, imColumns), dtype=numpy.bool_)
+   else:
+      notchRejectFilter = numpy.ones((imRows, imColumns),
+                                     dtype=numpy.float32)
+
+   # centered frequency coordinates (measured from the center of the array)
+   v = numpy.arange(imRows, dtype=numpy.float32) - imRows//2
+   u = numpy.arange(imColumns, dtype=numpy.float32) - imColumns//2
 
    for center in range(len(notchCenter)):
-      # D1 is the distance from the notch
-      # D2 is the distance from the notch's conjugate 
-      D1 = numpy.roll(numpy.roll(distFilter,imRows/2 - notchCenter[center][0],axis=1),imColumns/2-notchCenter[center][1],axis=0)
-      D2 = numpy.roll(numpy.roll(distFilter,imRows/2 + notchCenter[center][0],axis=1),imColumns/2+notchCenter[center][1],axis=0)
-     
+      # D1 is the squared distance from the notch
+      # D2 is the squared distance from the notch's conjugate
+      D1sq = ((u - notchCenter[center][0])**2)[None,:] + \
+             ((v - notchCenter[center][1])**2)[:,None]
+      D2sq = ((u + notchCenter[center][0])**2)[None,:] + \
+             ((v + notchCenter[center][1])**2)[:,None]
 
       if filterShape == ipcv.IPCV_IDEAL:
-         notchRejectFilter[ D1 <= notchRadius[center] ] = 0
-         notchRejectFilter[ D2 <= notchRadius[center] ] = 0
+         # threshold squared distances against the squared notch radius
+         notchRejectFilter[ D1sq <= notchRadius[center]**2 ] = 0
+         notchRejectFilter[ D2sq <= notchRadius[center]**2 ] = 0
 
       elif filterShape == ipcv.IPCV_BUTTERWORTH:  # butterworth equation
-         
-         # To avoid a div by 0 error
-         productOfDs = D1 * D2
-         productOfDs[productOfDs == 0] == 1e-10
+         # evaluate 1 / (1 + (r**2 / (D1*D2))**order) in a single buffer
+         productOfDs = D1sq * D2sq
+         numpy.sqrt(productOfDs, out=productOfDs)
 
+         # To avoid a div by 0 error
+         productOfDs[productOfDs == 0] = 1e-10
 
-         nextNotchRejectFilter = 1 / ( 1 + (( notchRadius[center]**2 ) / (productOfDs)) ** order) 
-         notchRejectFilter = notchRejectFilter * nextNotchRejectFilter
+         numpy.divide(notchRadius[center]**2, productOfDs,
+                      out=productOfDs)
+         numpy.power(productOfDs, order, out=productOfDs)
+         productOfDs += 1
+         numpy.reciprocal(productOfDs, out=productOfDs)
+         notchRejectFilter *= productOfDs
 
       else: # Third filter type option is Gaussian
-         nextNotchRejectFilter = 1 - numpy.exp( -0.5 * (D1 * D2) / ( notchRadius[center]**2) )
-         notchRejectFilter = notchRejectFilter * nextNotchRejectFilter
+         # evaluate 1 - exp(-0.5*D1*D2 / r**2) in a single buffer
+         buffer = D1sq * D2sq
+         numpy.sqrt(buffer, out=buffer)
+         buffer *= -0.5 / notchRadius[center]**2
+         numpy.exp(buffer, out=buffer)
+         numpy.subtract(1.0, buffer, out=buffer)
+         notchRejectFilter *= buffer
 
-   notchRejectFilter = numpy.roll(numpy.roll(notchRejectFilter, imRows/2, axis=0), imColumns/2, axis=1)
-   
-   return notchRejectFilter.astype(numpy.float64)
+   return notchRejectFilter
 
 
 
@@ -130,16 +176,16 @@ if __name__ == '__main__':
    # Create a 3D plot and image visualization of the frequency domain filter
    rows = im.shape[0]
    columns = im.shape[1]
-   u = numpy.arange(-columns/2, columns/2, 1)
-   v = numpy.arange(-rows/2, rows/2, 1)
+   u = numpy.arange(-columns//2, columns//2)
+   v = numpy.arange(-rows//2, rows//2)
    u, v = numpy.meshgrid(u, v)
 
    figure = matplotlib.pyplot.figure('Frequency Domain Filter', (14, 6))
    p = figure.add_subplot(1, 2, 1, projection='3d')
    p.set_xlabel('u')
-   p.set_xlim3d(-columns/2, columns/2)
+   p.set_xlim3d(-columns//2, columns//2)
    p.set_ylabel('v')
-   p.set_ylim3d(-rows/2, rows/2)
+   p.set_ylim3d(-rows//2, rows//2)
    p.set_zlabel('Weight')
    p.set_zlim3d(0, 1)
    p.plot_surface(u, v, frequencyFilter)
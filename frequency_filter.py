@@ -1,7 +1,21 @@
 import ipcv
 import numpy
 
-def frequency_filter(im, frequencyFilter, delta=0):
+try:
+   import scipy.fft
+except ImportError:
+   scipy = None
+
+try:
+   import cupy
+except ImportError:
+   cupy = None
+
+# pixel count above which the FFT pipeline is offloaded to the GPU when
+# cupy is importable; below this the host/device transfers dominate
+GPU_PIXEL_THRESHOLD = 1048576
+
+def frequency_filter(im, frequencyFilter, delta=0, centered=True):
    '''
    title::
       frequency_filter
@@ -9,41 +23,113 @@ def frequency_filter(im, frequencyFilter, delta=0):
    description::
       This method applies a frequency filter to the Fourier transform
       of the specified input image. 
-      First, the image dimensions are determined. The 2D inverse Fourier
-      Transform is taken of the input image, which is then shifted to
-      center the zero-frequency component to the center of the array.
-      The transform is then multiplied by the frequency filter.
-      The result is shifted back and the 2D inverse Fourier transform is 
-      taken. These steps are performed for each band in the input image.
-      The filtered image is returned as type numpy.complex128. 
+      The centered frequency filter is shifted once into the natural
+      ordering of the Fourier transform. The 2D Fourier transform is then
+      taken of every band of the input image at once, multiplied by the
+      shifted filter, and inverse transformed, again for all bands at
+      once. Shifting the filter rather than the transform is equivalent
+      and avoids rolling every band's complex spectrum to the center and
+      back. When scipy is available its multi-threaded FFT is used for
+      the transforms.
+      Real input images (the common case) are transformed with the real
+      FFT, which computes and stores only the non-redundant half of the
+      conjugate-symmetric spectrum, and the filtered image is returned
+      as a real array; this relies on the symmetry of the centered
+      filters that the ipcv filter constructors produce. Complex input
+      is processed with the full complex transforms and returned as
+      type numpy.complex128.
 
    attributes::
       im
-         Input source image, of type numpy array
+         Input source image, of type numpy array; either a 2D grayscale
+         array or a 3D rows x columns x bands array
       frequencyFilter
          Mask to be applied to the input image to filter out some
          frequencies and preserve others
       delta
-         Bias value added to the filtered image with a default value of 0.          
+         Bias value added to the filtered image with a default value of 0.
+      centered
+         Boolean (default True) indicating that the supplied filter is in
+         centered layout and needs shifting into FFT-natural order. Pass
+         False for filters built directly in natural order (e.g. from
+         ipcv.filter_lowpass_fft), which skips the shift entirely.
 
    returns::
-      Filtered image array of type numpy.complex128
+      Filtered image array; real (single precision) for real input
+      images, numpy.complex128 for complex input
 
    author::
       Victoria Scholl
    '''
 
-   # Find the image dimensions
-   imRows, imColumns, imBands, dataType = ipcv.dimensions(im) 
-   filteredImage = numpy.zeros((imRows,imColumns,imBands))
-   
-   for band in range(imBands): 
-      imTransform = numpy.fft.fft2(im[:,:,band])
-      transformCentered = numpy.fft.fftshift(imTransform)
-      filteredTransform = transformCentered * frequencyFilter
-      filteredUncentered = numpy.fft.ifftshift(filteredTransform)
-      filteredImage[:,:,band] = numpy.fft.ifft2(filteredUncentered)
-   
+   # large images are FFT-bound and data-parallel across rows, columns
+   # and bands; hand them to the GPU implementation when cupy is present
+   if cupy is not None and im.size >= GPU_PIXEL_THRESHOLD:
+      return ipcv.frequency_filter_gpu(im, frequencyFilter, delta, centered)
+
+   # shift the (real, 2D) filter into FFT-natural order once instead of
+   # rolling every band's complex spectrum to the center and back, since
+   # ifftshift(fftshift(X) * F) == X * ifftshift(F); filters built in
+   # natural order need no shift at all
+   if centered:
+      shiftedFilter = numpy.fft.ifftshift(frequencyFilter)
+   else:
+      shiftedFilter = frequencyFilter
+
+   if numpy.isrealobj(im):
+      # real input: the spectrum is conjugate-symmetric, so the real FFT
+      # computes and stores only the non-redundant half of it; slice the
+      # shifted filter to the matching half-spectrum columns
+      halfFilter = shiftedFilter[:, :im.shape[1]//2 + 1]
+
+      # single precision: the filters are float32 and the imagery is
+      # 8-bit, so transforming in float32 keeps the spectrum in
+      # complex64 and halves its memory footprint
+      imSingle = numpy.asarray(im, dtype=numpy.float32)
+
+      # transform all bands at once; scipy's FFT runs the batched
+      # transforms multi-threaded when it is available
+      if scipy is not None:
+         imTransform = scipy.fft.rfft2(imSingle, axes=(0,1), workers=-1)
+      else:
+         imTransform = numpy.fft.rfft2(imSingle, axes=(0,1))
+
+      # grayscale images arrive as 2D arrays (e.g. from cv2) and need no
+      # band axis in the broadcast
+      if im.ndim == 2:
+         filteredTransform = imTransform * halfFilter
+      else:
+         filteredTransform = imTransform * halfFilter[:,:,None]
+
+      if scipy is not None:
+         filteredImage = scipy.fft.irfft2(filteredTransform,
+                                          s=im.shape[:2], axes=(0,1),
+                                          workers=-1)
+      else:
+         filteredImage = numpy.fft.irfft2(filteredTransform,
+                                          s=im.shape[:2], axes=(0,1))
+
+      filteredImage += delta
+
+      return filteredImage
+
+   # complex input: full complex transforms, all bands at once
+   if scipy is not None:
+      imTransform = scipy.fft.fft2(im, axes=(0,1), workers=-1)
+   else:
+      imTransform = numpy.fft.fft2(im, axes=(0,1))
+
+   if im.ndim == 2:
+      filteredTransform = imTransform * shiftedFilter
+   else:
+      filteredTransform = imTransform * shiftedFilter[:,:,None]
+
+   if scipy is not None:
+      filteredImage = scipy.fft.ifft2(filteredTransform, axes=(0,1),
+                                      workers=-1)
+   else:
+      filteredImage = numpy.fft.ifft2(filteredTransform, axes=(0,1))
+
    filteredImage += delta
 
    return filteredImage.astype(numpy.complex128)
@@ -73,16 +159,15 @@ if __name__ == '__main__':
    #                                          order=2,
    #                                          filterShape=ipcv.IPCV_GAUSSIAN)
    
-   startTime = time.clock()
+   startTime = time.time()
    offset = 0
    filteredImage = ipcv.frequency_filter(im, frequencyFilter, delta=offset)
-   filteredImage = numpy.abs(filteredImage)
    filteredImage = filteredImage.astype(dtype=numpy.uint8)
    
    # Clipping the filtered image assuming 8-bit 
    filteredImage[ filteredImage > 255] = 255
-   elapsedTime = time.clock() - startTime
-   print 'Elapsed time (frequency_filter) = %s [s]' % elapsedTime
+   elapsedTime = time.time() - startTime
+   print('Elapsed time (frequency_filter) = %s [s]' % elapsedTime)
 
    cv2.namedWindow(filename, cv2.WINDOW_AUTOSIZE)
    cv2.imshow(filename, im)